@@ -1,12 +1,18 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-# Make sure to import the function from your main app file
-from app import run_full_analysis
+# Make sure to import the shared analysis pieces from your main app file
+from app import build_llm_inputs, build_batch_inputs, BATCH_ANALYSIS_CHAIN
+from market_data import download_batched
 
 # --- Configuration ---
 DATABASE_URL = os.getenv("DATABASE_URL")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_BATCH_SIZE = 6 # symbols analysed per prompt
+INPUT_WORKERS = 8 # concurrent P/E lookups and past-performance queries while building prompt inputs
 
 def get_db_connection():
     return psycopg2.connect(DATABASE_URL)
@@ -20,49 +26,73 @@ def run_proactive_analysis():
     conn = get_db_connection()
     cur = conn.cursor(cursor_factory=RealDictCursor)
 
-    # Get all unique stocks from all user watchlists
-    cur.execute("SELECT DISTINCT symbol, exchange FROM watchlist;")
-    unique_stocks = cur.fetchall()
-    print(f"Found {len(unique_stocks)} unique stocks to check.")
+    # Get all unique watchlist stocks that don't have an analysis for today yet, in a single query
+    cur.execute("""
+        SELECT DISTINCT w.symbol, w.exchange FROM watchlist w
+        WHERE NOT EXISTS (
+            SELECT 1 FROM decisions d
+            WHERE d.symbol = w.symbol AND d.timestamp::date = CURRENT_DATE
+        );
+    """)
+    pending_stocks = cur.fetchall()
+    print(f"Found {len(pending_stocks)} stocks without an analysis for today.")
 
-    for stock in unique_stocks:
-        symbol = stock['symbol']
-        exchange = stock['exchange']
+    # Fetch price history for every stale stock up front instead of one Yahoo call per symbol.
+    # Symbols missing from the batch (failed chunk, partial response) fall back to a per-symbol fetch.
+    histories = download_batched([stock['symbol'] for stock in pending_stocks], period="6mo", interval="1d")
 
-        # Check if an analysis for this stock already exists for today
-        cur.execute("""
-            SELECT id FROM decisions
-            WHERE symbol = %s AND DATE(timestamp) = CURRENT_DATE
-        """, (symbol,))
+    # Each symbol still needs its own P/E request and past-performance query, so inputs are built in parallel.
+    llm_inputs = {}
+    with ThreadPoolExecutor(max_workers=INPUT_WORKERS) as executor:
+        futures = {}
+        for stock in pending_stocks:
+            symbol = stock['symbol']
+            print(f"'{symbol}' needs a new analysis. Preparing inputs...")
+            futures[symbol] = executor.submit(build_llm_inputs, symbol, stock['exchange'], hist=histories.get(symbol))
+        for symbol, future in futures.items():
+            try:
+                llm_inputs[symbol] = future.result()
+            except Exception as e:
+                print(f"ERROR: Could not analyze '{symbol}'. Reason: {e}")
 
-        if cur.fetchone():
-            print(f"'{symbol}' already has an analysis for today. Skipping.")
-            continue
-
-        print(f"'{symbol}' needs a new analysis. Running...")
-
-        # --- THE FIX IS HERE ---
-        # We call run_full_analysis without the user_id, as it's not needed for the analysis itself.
-        analysis_result = run_full_analysis(symbol=symbol, exchange=exchange)
+    # Group symbols into multi-item prompts and run every prompt concurrently.
+    # abatch serializes unless max_concurrency is given explicitly.
+    symbols = list(llm_inputs)
+    batches = [symbols[i:i + LLM_BATCH_SIZE] for i in range(0, len(symbols), LLM_BATCH_SIZE)]
+    results = asyncio.run(BATCH_ANALYSIS_CHAIN.abatch([build_batch_inputs([llm_inputs[s] for s in batch]) for batch in batches],
+                                                      config={"max_concurrency": LLM_MAX_CONCURRENCY},
+                                                      return_exceptions=True))
 
-        if "error" in analysis_result:
-            print(f"ERROR: Could not analyze '{symbol}'. Reason: {analysis_result['error']}")
+    rows = []
+    for batch, batch_result in zip(batches, results):
+        if isinstance(batch_result, Exception):
+            print(f"ERROR: Could not analyze {batch}. Reason: {batch_result}")
             continue
+        analyses = {a.symbol: a for a in batch_result.analyses}
 
-        # Save the new analysis to the database
+        for symbol in batch:
+            analysis_result = analyses.get(symbol)
+            if not analysis_result:
+                print(f"ERROR: Could not analyze '{symbol}'. Reason: missing from the batch response.")
+                continue
+            inputs = llm_inputs[symbol]
+            rows.append((symbol, inputs['exchange'], inputs['close_price'], analysis_result.decision,
+                         analysis_result.confidence, analysis_result.technical_summary,
+                         analysis_result.fundamental_summary, analysis_result.sentiment_summary,
+                         analysis_result.final_summary))
+
+    # Save all new analyses to the database in one statement and one commit
+    if rows:
         try:
-            cur.execute("""
+            execute_values(cur, """
                 INSERT INTO decisions (symbol, exchange, price_at_decision, decision, confidence,
                                        technical_summary, fundamental_summary, sentiment_summary, final_summary)
-                VALUES (%(symbol)s, %(exchange)s, %(price_at_decision)s, %(decision)s, %(confidence)s,
-                        %(technical_summary)s, %(fundamental_summary)s, %(sentiment_summary)s, %(final_summary)s)
-            """, {
-                'symbol': symbol, 'exchange': exchange, **analysis_result
-            })
+                VALUES %s
+            """, rows, page_size=200)
             conn.commit()
-            print(f"Successfully saved new analysis for '{symbol}'.")
+            print(f"Successfully saved {len(rows)} new analyses.")
         except Exception as e:
-            print(f"DATABASE ERROR for '{symbol}': {e}")
+            print(f"DATABASE ERROR while saving analyses: {e}")
             conn.rollback()
 
     cur.close()
@@ -72,4 +102,3 @@ def run_proactive_analysis():
 
 if __name__ == "__main__":
     run_proactive_analysis()
-
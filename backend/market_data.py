@@ -0,0 +1,30 @@
+import yfinance as yf
+import pandas as pd
+
+YF_BATCH_SIZE = 20 # Yahoo rejects larger multi-symbol requests
+
+def download_batched(symbols: list, **kwargs) -> dict:
+    """
+    Runs yf.download over the symbols YF_BATCH_SIZE tickers at a time and
+    returns a {symbol: DataFrame} mapping of their bars. Extra keyword arguments
+    (period, interval, ...) are passed through. Symbols without data are left out.
+    """
+    histories = {}
+    for i in range(0, len(symbols), YF_BATCH_SIZE):
+        chunk = symbols[i:i + YF_BATCH_SIZE]
+        data = yf.download(tickers=chunk, group_by="ticker", threads=True, progress=False, **kwargs)
+        if data.empty:
+            continue
+
+        for symbol in chunk:
+            # group_by="ticker" yields (symbol, field) columns; older yfinance returns flat columns for one ticker.
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                hist = data[symbol]
+            else:
+                hist = data
+            hist = hist.dropna(how="all")
+            if not hist.empty:
+                histories[symbol] = hist
+    return histories
@@ -2,12 +2,13 @@ import yfinance as yf
 import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
+import numpy as np
+import pandas as pd
 from datetime import date, timedelta
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.output_parsers import JsonOutputParser
 import json
-import re
 
 # --- Configuration ---
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -48,6 +49,10 @@ Provide your output as a single, valid JSON object only.
 }}
 """)
 
+# JSON mode makes the model return a bare JSON object, so no regex extraction is needed.
+# The chain is stateless, so it is composed once and reused for every index.
+PREDICTION_CHAIN = prediction_prompt | llm.bind(response_format={"type": "json_object"}) | JsonOutputParser()
+
 def get_db_connection():
   return psycopg2.connect(DATABASE_URL)
 
@@ -68,32 +73,45 @@ def evaluate_last_week_predictions():
     conn.close()
     return
 
+  # Fetch the entire week's actual data for every index in one call
+  symbols = sorted({pred['symbol'] for pred in predictions_to_evaluate})
+  week_end = max(pred['week_end_date'] for pred in predictions_to_evaluate)
+  try:
+    actual_data = yf.download(tickers=symbols, start=last_week_start, end=week_end + timedelta(days=1), group_by="ticker", progress=False)
+    # The index can come back timezone-aware and/or with intraday times; normalize it to naive
+    # midnight dates so it lines up with the predicted days instead of silently missing them.
+    if actual_data.index.tz is not None:
+      actual_data.index = actual_data.index.tz_localize(None)
+    actual_data.index = actual_data.index.normalize()
+  except Exception as e:
+    # Leave the predictions unevaluated for the next run rather than aborting the whole job.
+    print(f"Error fetching last week's prices for {', '.join(symbols)}: {e}. Skipping evaluation.")
+    cur.close()
+    conn.close()
+    return
+
   for pred in predictions_to_evaluate:
     try:
       symbol = pred['symbol']
       predicted_days = pred['daily_predictions_json']
 
-      # Fetch the entire week's actual data
-      actual_hist = yf.download(symbol, start=pred['week_start_date'], end=pred['week_end_date'] + timedelta(days=1), progress=False)
-
-      performance_lines = []
-      total_diff_percent = 0
-
       if not predicted_days:
         print(f"Skipping evaluation for {symbol} due to missing daily prediction data.")
         continue
 
-      for i, daily_pred in enumerate(predicted_days):
-        day_date = pred['week_start_date'] + timedelta(days=i)
-        if day_date in actual_hist.index:
-          actual_price = actual_hist.loc[day_date]['Close']
-          predicted_price = daily_pred['predicted_price']
-          diff_percent = ((actual_price - predicted_price) / predicted_price) * 100 if predicted_price > 0 else 0
-          performance_lines.append(f"- {daily_pred['day']}: Off by {diff_percent:.2f}%")
-          total_diff_percent += diff_percent
-
-      avg_diff = total_diff_percent / len(predicted_days) if predicted_days else 0
-      final_actual_price = actual_hist['Close'].iloc[-1]
+      actual_hist = actual_data[symbol] if isinstance(actual_data.columns, pd.MultiIndex) else actual_data
+
+      # Line up actual closes with the predicted trading days; days without data become NaN.
+      trading_days = pd.date_range(pred['week_start_date'], periods=len(predicted_days), freq='B')
+      closes = actual_hist['Close'].reindex(trading_days).to_numpy(dtype=np.float64)
+      predicted = np.array([d['predicted_price'] for d in predicted_days], dtype=np.float64)
+      traded = ~np.isnan(closes)
+      with np.errstate(divide='ignore', invalid='ignore'):
+        diffs = np.where(predicted > 0, (closes - predicted) / predicted * 100, 0.0)
+
+      performance_lines = [f"- {d['day']}: Off by {diff:.2f}%" for d, diff, ok in zip(predicted_days, diffs, traded) if ok]
+      avg_diff = diffs[traded].mean() if traded.any() else 0
+      final_actual_price = actual_hist['Close'].dropna().iloc[-1]
       summary = f"Avg Daily Error: {avg_diff:.2f}%. " + " ".join(performance_lines)
 
       cur.execute("""
@@ -128,21 +146,17 @@ def generate_new_weekly_predictions():
 
       stock = yf.Ticker(symbol)
       hist = stock.history(period="1y")
+      closes = hist['Close'].to_numpy()
       data_summary = {
-        "current_price": hist['Close'].iloc[-1],
-        "year_high": hist['High'].max(), "year_low": hist['Low'].min(),
-        "fifty_day_avg": hist['Close'][-50:].mean(), "two_hundred_day_avg": hist['Close'][-200:].mean(),
+        "current_price": closes[-1],
+        "year_high": hist['High'].to_numpy().max(), "year_low": hist['Low'].to_numpy().min(),
+        "fifty_day_avg": closes[-50:].mean(), "two_hundred_day_avg": closes[-200:].mean(),
       }
 
-      chain = prediction_prompt | llm | StrOutputParser()
-      raw_response = chain.invoke({
+      response = PREDICTION_CHAIN.invoke({
         "symbol": symbol, "week_start_date": week_start.strftime("%Y-%m-%d"), "week_end_date": week_end.strftime("%Y-%m-%d"), **data_summary
       })
 
-      json_match = re.search(r'\{.*\}', raw_response, re.DOTALL)
-      if not json_match: raise ValueError("Could not find valid JSON in LLM response.")
-      response = json.loads(json_match.group())
-
       cur.execute("""
                 INSERT INTO weekly_index_predictions
                 (symbol, prediction_date, week_start_date, week_end_date, daily_predictions_json, weekly_reasoning)
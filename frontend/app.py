@@ -1,48 +1,203 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+import httpx
+import orjson
+import asyncio
 import pandas as pd
+import numpy as np
 import yfinance as yf
 from datetime import date
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 
 # --- Configuration & Helper Functions ---
 BACKEND = os.getenv("BACKEND_URL", "http://localhost:8000")
 st.set_page_config(page_title="AI Trading Agent | DalalStreetAI", layout="wide")
-
-@st.cache_data(ttl=600)
-def get_current_prices(symbols):
+REQUEST_TIMEOUT = 10
+ANALYZE_TIMEOUT = 120 # a fresh analysis waits on the LLM
+YAHOO_SPARK_URL = "https://query1.finance.yahoo.com/v8/finance/spark"
+PRICE_CACHE_SECONDS = 600
+YAHOO_BATCH_SIZE = 20 # mirrors backend/market_data.YF_BATCH_SIZE; the frontend image does not ship the backend modules
+PAGES = ("My Dashboard", "My Portfolio", "Master Recommendations", "Agent Performance")
+EXCHANGES = ("NSE", "BSE")
+DECISION_COLORS = {"BUY": "darkgreen", "SELL": "darkred", "HOLD": "orange"}
+ANALYSIS_TABS = (("📝 Final Summary & Risks", "final_summary"), ("📈 Technical", "technical_summary"),
+                 ("🏢 Fundamental", "fundamental_summary"), ("📰 Sentiment", "sentiment_summary"))
+RECOMMENDATION_COLUMNS = ('timestamp', 'symbol', 'decision', 'confidence', 'price_at_decision', 'final_summary')
+
+# Shared HTTP session so every backend call reuses pooled keep-alive connections.
+SESSION = requests.Session()
+SESSION.headers.update({"Accept": "application/json"})
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+def _json(resp):
+    """Decodes a response body with orjson straight from bytes, skipping the stdlib str round-trip."""
+    return orjson.loads(resp.content)
+
+def _spark_series(body):
     """
-    A robust function to fetch current prices for a list of stock symbols,
-    handling both single and multiple symbol cases correctly and gracefully
-    managing missing data.
+    Returns {symbol: closes} from a spark response body. Yahoo serves the documented
+    {"spark": {"result": [{"symbol", "response": [{"indicators": {"quote": [{"close": [...]}]}}]}]}}
+    shape as well as a flat {symbol: {"close": [...]}} one; anything else raises ValueError.
     """
-    if not symbols:
-        return {}
+    try:
+        if isinstance(body, dict) and "spark" in body:
+            return {r["symbol"]: r["response"][0]["indicators"]["quote"][0]["close"] for r in body["spark"]["result"] or []}
+        return {symbol: series["close"] for symbol, series in body.items()}
+    except (KeyError, IndexError, TypeError, AttributeError) as e:
+        raise ValueError(f"unexpected spark payload: {e!r}") from e
 
+def _spark_closes(symbols):
+    """
+    Daily closes for the last two sessions from Yahoo's multi-symbol spark
+    endpoint, YAHOO_BATCH_SIZE symbols per request. One column per symbol.
+    """
+    closes = {}
+    for i in range(0, len(symbols), YAHOO_BATCH_SIZE):
+        chunk = symbols[i:i + YAHOO_BATCH_SIZE]
+        res = SESSION.get(YAHOO_SPARK_URL, params={"symbols": ",".join(chunk), "range": "2d", "interval": "1d", "indicators": "close"},
+                          headers={"User-Agent": "Mozilla/5.0"}, timeout=REQUEST_TIMEOUT)
+        res.raise_for_status()
+        for symbol, series in _spark_series(_json(res)).items():
+            last_two = pd.Series(series, dtype="float64").iloc[-2:]
+            last_two.index = range(2 - len(last_two), 2) # keep the latest close in the last row
+            closes[symbol] = last_two
+    return pd.DataFrame(closes)
+
+def _download_closes(symbols):
+    """Fallback for _spark_closes using yfinance's OHLCV download."""
     data = yf.download(symbols, period="2d", progress=False)
     if data.empty:
-        return {s: {"price": 0, "change": 0, "change_percent": 0} for s in symbols}
-
-    prices = {}
+        return pd.DataFrame(columns=symbols)
     close_prices = data['Close']
+    if isinstance(close_prices, pd.Series):
+        close_prices = close_prices.to_frame(symbols[0])
+    return close_prices
 
-    for symbol in symbols:
-        hist = close_prices[symbol] if isinstance(close_prices, pd.DataFrame) else close_prices
+def _fetch_prices(symbols):
+    """
+    Fetches current prices for a list of stock symbols, handling both single
+    and multiple symbol cases correctly and gracefully managing missing data.
+    """
+    try:
+        close_prices = _spark_closes(symbols)
+    except (requests.RequestException, ValueError) as e:
+        # HTTP failures and unexpected payloads (ValueError, incl. JSON decode errors) fall back to
+        # the OHLCV download; logged so a silently broken spark path doesn't go unnoticed.
+        print(f"Spark quote fetch failed ({e}); falling back to yf.download for {len(symbols)} symbol(s).")
+        close_prices = _download_closes(symbols)
+
+    close_prices = close_prices.reindex(columns=symbols)
+    if len(close_prices) < 2:
+        return {s: {"price": 0, "change": 0, "change_percent": 0} for s in symbols}
 
-        if isinstance(hist, pd.Series) and len(hist) > 1 and not pd.isna(hist.iloc[-1]):
-            price = hist.iloc[-1]
-            prev_price = hist.iloc[-2]
+    # Work on the last two rows for all symbols at once; a missing or zero previous close
+    # yields NaN, which is reported as no change, and a missing latest price as all zeros.
+    last = close_prices.iloc[-1]
+    prev = close_prices.iloc[-2].replace(0, np.nan)
+    change = last - prev
+    prices = pd.DataFrame({"price": last, "change": change, "change_percent": change / prev * 100}).fillna(0)
+    return prices.T.to_dict()
 
-            if not pd.isna(prev_price) and prev_price != 0:
-                change = price - prev_price
-                change_percent = (change / prev_price) * 100
-                prices[symbol] = {"price": price, "change": change, "change_percent": change_percent}
-            else:
-                prices[symbol] = {"price": price, "change": 0, "change_percent": 0}
-        else:
-            prices[symbol] = {"price": 0, "change": 0, "change_percent": 0}
+@st.cache_resource
+def _price_cache():
+    return {}
 
-    return prices
+def get_current_prices(symbols):
+    """
+    Current price, change and change % per symbol. Prices are cached per
+    symbol, so editing the portfolio only fetches symbols not seen recently,
+    and those are fetched together in one batched call.
+    """
+    cache, now = _price_cache(), time.monotonic()
+    misses = [s for s in symbols if s not in cache or now - cache[s][0] >= PRICE_CACHE_SECONDS]
+    fetched = _fetch_prices(misses) if misses else {}
+    for symbol, price in fetched.items():
+        if price["price"]: cache[symbol] = (now, price) # zeros mean no data; retry next time
+    return {s: fetched[s] if s in fetched else cache[s][1] for s in symbols}
+
+# Kept short on purpose: it only spans back-to-back reruns, so it adds seconds, not minutes,
+# on top of the per-symbol price TTL.
+@st.cache_data(ttl=10)
+def _prices_for(sym_tuple):
+    """Memoizes get_current_prices per sorted symbol tuple so reruns of an unchanged portfolio skip the lookup."""
+    return get_current_prices(list(sym_tuple))
+
+# Dashboard and per-user reads are kept in a process-wide store with a TTL per path, tiered by how
+# often the data changes. Per-user entries are keyed by (path, user_id), so a mutation expires only
+# that user's entry instead of clearing a whole cache.
+CACHE_TTL = {"/indices/summary": 60, "/indices/weekly-forecast": 3600, "/watchlist": 15, "/portfolio": 15}
+DASHBOARD_PATHS = ("/indices/summary", "/indices/weekly-forecast")
+
+@st.cache_resource
+def _store():
+    return {}
+
+def _cached(key):
+    hit = _store().get(key)
+    if hit and time.monotonic() - hit[0] < CACHE_TTL[key[0]]:
+        return hit[1]
+    return None
+
+async def _fetch_dashboard_async(paths):
+    async with httpx.AsyncClient(base_url=BACKEND, timeout=REQUEST_TIMEOUT) as client:
+        return await asyncio.gather(*(client.get(path) for path in paths), return_exceptions=True)
+
+def _json_or_none(response):
+    if isinstance(response, Exception) or not response.is_success: return None
+    try: return _json(response)
+    except ValueError: return None
+
+def get_dashboard_data():
+    """
+    Returns the index summary and weekly forecast, each cached for its own TTL.
+    Expired entries are fetched concurrently. A call that fails comes back as
+    None, and isn't cached, so the rest of the dashboard still renders.
+    """
+    data = {path: _cached((path, None)) for path in DASHBOARD_PATHS}
+    misses = [path for path in DASHBOARD_PATHS if data[path] is None]
+    if misses:
+        for path, response in zip(misses, asyncio.run(_fetch_dashboard_async(misses))):
+            data[path] = _json_or_none(response)
+            if data[path] is not None:
+                _store()[(path, None)] = (time.monotonic(), data[path])
+    return tuple(data[path] for path in DASHBOARD_PATHS)
+
+@st.cache_data(ttl=3600)
+def _preds_df(preds_tuple):
+    """Builds the daily forecast table once per distinct prediction list instead of on every rerun."""
+    return pd.DataFrame([dict(items) for items in preds_tuple]).set_index('day')
+
+def api_get(path):
+    return _json(SESSION.get(f"{BACKEND}{path}", timeout=REQUEST_TIMEOUT))
+
+def get_user_data(path, user_id):
+    """Returns the decoded response; only successful list responses are stored, so errors aren't cached."""
+    key = (path, user_id)
+    data = _cached(key)
+    if data is not None:
+        return data
+    res = SESSION.get(f"{BACKEND}{path}/{user_id}", timeout=REQUEST_TIMEOUT)
+    data = _json(res)
+    if res.ok and isinstance(data, list):
+        _store()[key] = (time.monotonic(), data)
+    return data
+
+def invalidate_user_data(path, user_id):
+    _store().pop((path, user_id), None)
+
+# Shared backend reads are cached with TTLs tiered by how often the data changes.
+@st.cache_data(ttl=300)
+def get_latest_recommendations():
+    return api_get("/recommendations/latest")
+
+@st.cache_data(ttl=600)
+def get_performance_summary():
+    return api_get("/performance/summary")
 
 # --- Session State & Login Persistence ---
 if "user" not in st.session_state: st.session_state.user = None
@@ -52,8 +207,8 @@ if st.session_state.user is None:
     try:
         username_in_query = st.query_params.get("user")
         if username_in_query:
-            res = requests.post(f"{BACKEND}/users/create", params={"username": username_in_query})
-            if res.ok: st.session_state.user = res.json()
+            res = SESSION.post(f"{BACKEND}/users/create", params={"username": username_in_query}, timeout=REQUEST_TIMEOUT)
+            if res.ok: st.session_state.user = _json(res)
     except Exception: pass
 
 # --- Sidebar ---
@@ -70,14 +225,14 @@ with st.sidebar:
         username = st.text_input("Username", placeholder="Enter username")
         if st.button("Login"):
             if username.strip():
-                res = requests.post(f"{BACKEND}/users/create", params={"username": username.strip()})
-                st.session_state.user = res.json()
+                res = SESSION.post(f"{BACKEND}/users/create", params={"username": username.strip()}, timeout=REQUEST_TIMEOUT)
+                st.session_state.user = _json(res)
                 st.query_params["user"] = username.strip()
                 st.rerun()
 
     if st.session_state.user:
         st.divider()
-        app_mode = st.radio("Choose a Page", ("My Dashboard", "My Portfolio", "Master Recommendations", "Agent Performance"))
+        app_mode = st.radio("Choose a Page", PAGES)
 
 # --- Main App ---
 if not st.session_state.user:
@@ -87,23 +242,27 @@ else:
     if app_mode == "My Dashboard":
         st.title("😀 My Trading Dashboard")
 
-        indices = requests.get(f"{BACKEND}/indices/summary").json()
+        indices, forecast_data = get_dashboard_data()
         if indices:
+            # All tiles go out as one markdown block; only the Analyze buttons need to be widgets.
+            tiles = "".join(
+                f"<div style='flex:1;'><b>{index['name']}</b><br/><span style='font-size:1.6rem;'>{index['price']:,.2f}</span><br/>"
+                f"<span style='color:{'green' if index['change'] >= 0 else 'red'};'>{index['change']:,.2f} ({index['change_percent']:.2f}%)</span></div>"
+                for index in indices)
+            st.markdown(f"<div style='display:flex;gap:1rem;'>{tiles}</div>", unsafe_allow_html=True)
             cols = st.columns(len(indices))
             for i, index in enumerate(indices):
                 with cols[i]:
-                    delta = f"{index['change']:,.2f} ({index['change_percent']:.2f}%)"
-                    st.metric(label=index['name'], value=f"{index['price']:,.2f}", delta=delta)
                     if st.button(f"Analyze {index['name']}", key=f"analyze_{index.get('symbol', index['name'])}"):
                         with st.spinner(f"🤖 AI agent is analyzing {index['name']}..."):
-                            res = requests.get(f"{BACKEND}/analyze/{st.session_state.user['id']}/{index['symbol']}", params={"exchange": "INDEX"})
-                            st.session_state.latest_result = res.json()
+                            res = SESSION.get(f"{BACKEND}/analyze/{st.session_state.user['id']}/{index['symbol']}", params={"exchange": "INDEX"}, timeout=ANALYZE_TIMEOUT)
+                            st.session_state.latest_result = _json(res)
                             st.session_state.analyzed_item = index['symbol']
         st.divider()
 
         st.subheader("🗓️ AI Weekly Market Forecast")
         try:
-            forecast_data = requests.get(f"{BACKEND}/indices/weekly-forecast").json()
+            if forecast_data is None: raise ValueError("the backend did not respond")
             fc_cols = st.columns(2)
             with fc_cols[0]:
                 st.markdown("<h5>Forecast for Next Week</h5>", unsafe_allow_html=True)
@@ -111,8 +270,7 @@ else:
                     for forecast in forecast_data["forecasts"]:
                         st.info(f"**{forecast['symbol']} Reasoning:** {forecast['weekly_reasoning']}")
                         if forecast.get('daily_predictions_json'):
-                            df_preds = pd.DataFrame(forecast['daily_predictions_json'])
-                            st.dataframe(df_preds.set_index('day'))
+                            st.dataframe(_preds_df(tuple(tuple(d.items()) for d in forecast['daily_predictions_json'])))
                 else: st.write("New weekly forecast is being generated.")
             with fc_cols[1]:
                 st.markdown("<h5>Last Week's Performance</h5>", unsafe_allow_html=True)
@@ -125,20 +283,23 @@ else:
 
         with st.sidebar:
             st.subheader("📌 My Watchlist")
-            wl = requests.get(f"{BACKEND}/watchlist/{st.session_state.user['id']}").json()
+            try: wl = get_user_data("/watchlist", st.session_state.user['id'])
+            except (requests.RequestException, ValueError): wl = None
             watchlist = wl if isinstance(wl, list) else []
             if watchlist:
-                selected_str = st.selectbox("Select stock", [f"{s['symbol']} ({s['exchange']})" for s in watchlist])
-                symbol, exchange = selected_str.split(" ")[0], selected_str.split("(")[1][:-1]
+                options = {f"{s['symbol']} ({s['exchange']})": (s['symbol'], s['exchange']) for s in watchlist}
+                selected_str = st.selectbox("Select stock", list(options))
+                symbol, exchange = options[selected_str]
                 if st.button("🗑️ Remove From Watchlist"):
-                    requests.delete(f"{BACKEND}/watchlist/remove", params={"user_id": st.session_state.user["id"], "symbol": symbol, "exchange": exchange})
+                    SESSION.delete(f"{BACKEND}/watchlist/remove", params={"user_id": st.session_state.user["id"], "symbol": symbol, "exchange": exchange}, timeout=REQUEST_TIMEOUT)
+                    invalidate_user_data("/watchlist", st.session_state.user["id"])
                     st.rerun()
 
                 # This button is now separate from the display logic
                 if st.button("Analyze Selected Stock", key="analyze_watchlist_stock"):
                     with st.spinner(f"🤖 AI agent is analyzing {symbol}..."):
-                        res = requests.get(f"{BACKEND}/analyze/{st.session_state.user['id']}/{symbol}", params={"exchange": exchange})
-                        st.session_state.latest_result = res.json()
+                        res = SESSION.get(f"{BACKEND}/analyze/{st.session_state.user['id']}/{symbol}", params={"exchange": exchange}, timeout=ANALYZE_TIMEOUT)
+                        st.session_state.latest_result = _json(res)
                         st.session_state.analyzed_item = symbol
 
             else:
@@ -146,9 +307,10 @@ else:
 
             with st.form("add_stock_form", clear_on_submit=True):
                 new_symbol = st.text_input("Add Stock or Index (e.g. INFY, ^NSEI)")
-                new_exchange = st.selectbox("Exchange", ["NSE", "BSE"])
+                new_exchange = st.selectbox("Exchange", EXCHANGES)
                 if st.form_submit_button("➕ Add to Watchlist"):
-                    requests.post(f"{BACKEND}/watchlist/add", params={"user_id": st.session_state.user["id"], "symbol": new_symbol, "exchange": new_exchange})
+                    SESSION.post(f"{BACKEND}/watchlist/add", params={"user_id": st.session_state.user["id"], "symbol": new_symbol, "exchange": new_exchange}, timeout=REQUEST_TIMEOUT)
+                    invalidate_user_data("/watchlist", st.session_state.user["id"])
                     st.rerun()
 
         # --- DEDICATED CONTAINER FOR ANALYSIS RESULTS ---
@@ -167,15 +329,14 @@ else:
                     analysis = res["analysis"]
                     is_cached = res.get("cached", False)
                     decision, confidence = analysis.get('decision', 'N/A'), analysis.get('confidence', 'N/A')
-                    color = {"BUY": "darkgreen", "SELL": "darkred", "HOLD": "orange"}.get(decision)
+                    color = DECISION_COLORS.get(decision)
 
-                    st.markdown(f"### <span style='color:{color};'>Decision: {decision}</span> (Confidence: {confidence})", unsafe_allow_html=True)
-                    st.caption(f"Price at decision: ₹{analysis.get('price_at_decision', 0):,.2f} | Source: {'Database Cache' if is_cached else 'Live AI Analysis'}")
+                    st.markdown(f"<h3><span style='color:{color};'>Decision: {decision}</span> (Confidence: {confidence})</h3>"
+                                f"<p style='color:gray;font-size:0.875rem;'>Price at decision: ₹{analysis.get('price_at_decision', 0):,.2f} | "
+                                f"Source: {'Database Cache' if is_cached else 'Live AI Analysis'}</p>", unsafe_allow_html=True)
 
-                    with st.expander("📝 Final Summary & Risks"): st.write(analysis.get('final_summary', 'N/A'))
-                    with st.expander("📈 Technical Summary"): st.write(analysis.get('technical_summary', 'N/A'))
-                    with st.expander("🏢 Fundamental Summary"): st.write(analysis.get('fundamental_summary', 'N/A'))
-                    with st.expander("📰 Sentiment Summary"): st.write(analysis.get('sentiment_summary', 'N/A'))
+                    for tab, (_, field) in zip(st.tabs([label for label, _ in ANALYSIS_TABS]), ANALYSIS_TABS):
+                        tab.write(analysis.get(field, 'N/A'))
         else:
             with analysis_container:
                 st.info("Click an 'Analyze' button to see the AI's deep-dive analysis here.")
@@ -186,27 +347,36 @@ else:
             with st.form("portfolio_form", clear_on_submit=True):
                 c1, c2, c3, c4 = st.columns(4)
                 p_symbol = c1.text_input("Symbol")
-                p_exchange = c2.selectbox("Exchange", ["NSE", "BSE"])
+                p_exchange = c2.selectbox("Exchange", EXCHANGES)
                 p_quantity = c3.number_input("Quantity", min_value=0.01, format="%.2f")
                 p_price = c4.number_input("Purchase Price", min_value=0.01, format="%.2f")
                 if st.form_submit_button("Add to Portfolio"):
-                    requests.post(f"{BACKEND}/portfolio/add", params={"user_id": st.session_state.user['id'], "symbol": p_symbol, "exchange": p_exchange, "quantity": p_quantity, "purchase_price": p_price})
+                    SESSION.post(f"{BACKEND}/portfolio/add", params={"user_id": st.session_state.user['id'], "symbol": p_symbol, "exchange": p_exchange, "quantity": p_quantity, "purchase_price": p_price}, timeout=REQUEST_TIMEOUT)
+                    invalidate_user_data("/portfolio", st.session_state.user['id'])
                     st.success(f"Added {p_quantity} shares of {p_symbol}.")
 
-        holdings = requests.get(f"{BACKEND}/portfolio/{st.session_state.user['id']}").json()
-        if not holdings: st.info("Your portfolio is empty.")
+        try: holdings = get_user_data("/portfolio", st.session_state.user['id'])
+        except (requests.RequestException, ValueError): holdings = None
+        if not isinstance(holdings, list): st.error("Could not load your portfolio. Please try again shortly.")
+        elif not holdings: st.info("Your portfolio is empty.")
         else:
             st.session_state.original_holdings = holdings
             df = pd.DataFrame(holdings)
-            price_data = get_current_prices(df['symbol'].unique().tolist())
-
-            df['current_price'] = df['symbol'].apply(lambda x: price_data.get(x, {}).get('price', 0))
-            df['market_value'] = df['current_price'] * df['quantity']
-            df['pnl'] = (df['current_price'] - df['purchase_price']) * df['quantity']
-            df['pnl_%'] = (df['pnl'] / (df['purchase_price'] * df['quantity'])).fillna(0) * 100
-
-            total_investment = (df['purchase_price'] * df['quantity']).sum()
-            total_market_value, total_pnl = df['market_value'].sum(), df['pnl'].sum()
+            price_data = _prices_for(tuple(sorted(set(df['symbol']))))
+
+            # One join fills price, change and change_percent together.
+            pdf = pd.DataFrame.from_dict(price_data, orient='index', columns=['price', 'change', 'change_percent']).rename_axis('symbol').reset_index()
+            df = df.merge(pdf, on='symbol', how='left').fillna({'price': 0.0, 'change': 0.0, 'change_percent': 0.0})
+            df.rename(columns={'price': 'current_price'}, inplace=True)
+            qty = df['quantity'].to_numpy(dtype=np.float64)
+            invested = df['purchase_price'].to_numpy(dtype=np.float64) * qty
+            market_value = df['current_price'].to_numpy(dtype=np.float64) * qty
+            pnl = market_value - invested
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pnl_percent = np.where(invested != 0, pnl / invested * 100, 0.0)
+            df['market_value'], df['pnl'], df['pnl_%'] = market_value, pnl, pnl_percent
+
+            total_investment, total_market_value, total_pnl = invested.sum(), market_value.sum(), pnl.sum()
             total_pnl_percent = (total_pnl / total_investment) * 100 if total_investment > 0 else 0
 
             c1, c2, c3 = st.columns(3)
@@ -214,30 +384,34 @@ else:
             c2.metric("Total P&L", f"₹{total_pnl:,.2f}", f"{total_pnl_percent:.2f}%")
 
             st.subheader("Your Holdings")
-            edited_df = st.data_editor(df, hide_index=True, num_rows="dynamic", key="portfolio_editor", disabled=['id', 'symbol', 'exchange', 'purchase_date', 'current_price', 'market_value', 'pnl', 'pnl_%'])
+            edited_df = st.data_editor(df, hide_index=True, num_rows="dynamic", key="portfolio_editor", disabled=['id', 'symbol', 'exchange', 'purchase_date', 'current_price', 'change', 'change_percent', 'market_value', 'pnl', 'pnl_%'])
             if st.button("Save Portfolio Changes"):
                 original_ids, edited_ids = {h['id'] for h in st.session_state.original_holdings}, set(edited_df['id'])
                 ids_to_delete = original_ids - edited_ids
                 deleted_count = 0
-                for holding_id in ids_to_delete:
-                    if requests.delete(f"{BACKEND}/portfolio/remove/{holding_id}").status_code == 200: deleted_count += 1
-                if deleted_count > 0: st.success(f"Successfully removed {deleted_count} holding(s)."), st.rerun()
+                if ids_to_delete:
+                    # Issue the deletes concurrently rather than one round-trip at a time.
+                    with ThreadPoolExecutor(max_workers=min(16, len(ids_to_delete))) as executor:
+                        futures = [executor.submit(SESSION.delete, f"{BACKEND}/portfolio/remove/{holding_id}", timeout=REQUEST_TIMEOUT) for holding_id in ids_to_delete]
+                        deleted_count = sum(1 for future in as_completed(futures) if future.result().status_code == 200)
+                if deleted_count > 0: invalidate_user_data("/portfolio", st.session_state.user['id']), st.success(f"Successfully removed {deleted_count} holding(s)."), st.rerun()
                 else: st.info("No changes to save.")
 
     elif app_mode == "Master Recommendations":
         st.title("🏆 Master AI Recommendations")
         st.info("Latest unique BUY/SELL signals from the AI in the last 3 days.")
-        recs = requests.get(f"{BACKEND}/recommendations/latest").json()
+        recs = get_latest_recommendations()
         if recs:
-            df = pd.DataFrame(recs).set_index('id')
-            st.dataframe(df[['timestamp', 'symbol', 'decision', 'confidence', 'price_at_decision', 'final_summary']])
+            # Keep only the displayed fields so the frame isn't built over every column the backend returns.
+            slim = [{k: r.get(k) for k in RECOMMENDATION_COLUMNS} for r in recs]
+            st.dataframe(pd.DataFrame(slim, index=pd.Index([r['id'] for r in recs], name='id')))
         else: st.write("No recent recommendations found.")
 
     elif app_mode == "Agent Performance":
         st.title("🤖 AI Agent Performance Dashboard")
         st.info("This dashboard shows the historical performance of the AI's BUY/SELL recommendations.")
         try:
-            summary = requests.get(f"{BACKEND}/performance/summary").json()
+            summary = get_performance_summary()
             if not summary or summary.get('total_trades', 0) == 0:
                 st.warning("No performance data available yet.")
             else: